@@ -1,15 +1,34 @@
 #!/usr/bin/env python3
 import os
+import posixpath
+import io
 import sys
 import json
+import time
+import re
+import hashlib
 import platform
+import shlex
+import signal
 import subprocess
 import tarfile
 import zipfile
 import shutil
+import filecmp
+import tempfile
+import threading
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# orjson is optional; both parsers accept bytes
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
 # ============================
 # CONFIGURATION
 # ============================
@@ -20,8 +39,52 @@ CACHE_DIR = Path.home() / ".shipm" / "cache"
 CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
 LOCAL_JSON = Path.home() / ".shipm" / "packages.json"
+LOCAL_JSON_META = LOCAL_JSON.with_suffix(".etag")
 
 UPDATE_URL = "https://raw.githubusercontent.com/PtaterTot/Shipment/refs/heads/main/shipm.py"
+UPDATE_META = Path.home() / ".shipm" / "shipm.etag"
+
+# One pooled session so repeated GitHub requests reuse TCP/TLS connections
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=16,
+    # raise_on_status=False hands the last 5xx back to the status checks
+    max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504],
+                      raise_on_status=False),
+))
+
+# Parsed package index, reused while LOCAL_JSON is unchanged
+_PKG_CACHE = {"mtime": None, "data": None}
+
+# ============================
+# Conditional GET helpers
+# ============================
+
+def _conditional_headers(meta_path, target):
+    """Build If-None-Match/If-Modified-Since headers for an unchanged local copy."""
+    try:
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        if os.stat(target).st_mtime_ns != meta["mtime"]:
+            return {}
+    except (OSError, ValueError, KeyError):
+        return {}
+
+    headers = {}
+    if meta.get("etag"):
+        headers["If-None-Match"] = meta["etag"]
+    if meta.get("last_modified"):
+        headers["If-Modified-Since"] = meta["last_modified"]
+    return headers
+
+def _save_validators(meta_path, target, r):
+    """Remember the ETag/Last-Modified of the response just written to target."""
+    meta = {
+        "mtime": os.stat(target).st_mtime_ns,
+        "etag": r.headers.get("ETag"),
+        "last_modified": r.headers.get("Last-Modified"),
+    }
+    meta_path.write_text(json.dumps(meta), encoding="utf-8")
 
 # ============================
 # JSON Repo Loader + Caching
@@ -31,10 +94,14 @@ def load_packages():
     """Load package index from GitHub with local cache fallback."""
     try:
         print("Fetching package index...")
-        r = requests.get(REPO_JSON_URL, timeout=5)
+        headers = _conditional_headers(LOCAL_JSON_META, LOCAL_JSON)
+        r = SESSION.get(REPO_JSON_URL, timeout=5, headers=headers)
 
-        if r.status_code == 200:
+        if r.status_code == 304:
+            print("Package index is up-to-date.")
+        elif r.status_code == 200:
             LOCAL_JSON.write_text(r.text, encoding="utf-8")
+            _save_validators(LOCAL_JSON_META, LOCAL_JSON, r)
             print("Package index updated.")
         else:
             print("Failed to update package index, using cached file...")
@@ -43,7 +110,14 @@ def load_packages():
         print("Network error, using cached package index...")
 
     if LOCAL_JSON.exists():
-        return json.loads(LOCAL_JSON.read_text(encoding="utf-8"))
+        mtime = LOCAL_JSON.stat().st_mtime_ns
+        if mtime == _PKG_CACHE["mtime"]:
+            return _PKG_CACHE["data"]
+
+        data = _json_loads(LOCAL_JSON.read_bytes())
+        _PKG_CACHE["mtime"] = mtime
+        _PKG_CACHE["data"] = data
+        return data
 
     print("ERROR: No package index available.")
     return {}
@@ -55,11 +129,33 @@ def load_packages():
 def self_update():
     print("Checking for updates...")
     try:
-        new = requests.get(UPDATE_URL).text
         current = os.path.realpath(sys.argv[0])
-        with open(current, "w", encoding="utf-8") as f:
-            f.write(new)
-        os.chmod(current, 0o755)
+        headers = _conditional_headers(UPDATE_META, current)
+        with SESSION.get(UPDATE_URL, headers=headers, stream=True) as r:
+            if r.status_code == 304:
+                print("Already up-to-date.")
+                return
+            r.raise_for_status()
+            r.raw.decode_content = True
+
+            # Stream next to the script, then swap it in atomically
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(current), prefix=".shipm-")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    shutil.copyfileobj(r.raw, f, length=64 * 1024)
+
+                if filecmp.cmp(tmp, current, shallow=False):
+                    _save_validators(UPDATE_META, current, r)
+                    print("Already up-to-date.")
+                    return
+
+                os.chmod(tmp, 0o755)
+                os.replace(tmp, current)
+            finally:
+                if os.path.exists(tmp):
+                    os.unlink(tmp)
+
+        _save_validators(UPDATE_META, current, r)
         print("Updated successfully!")
     except Exception as e:
         print("Update failed:", e)
@@ -68,10 +164,30 @@ def self_update():
 # System Detection
 # ============================
 
-def detect_system():
+_KNOWN_DISTROS = ("debian", "arch", "fedora")
+
+def _os_release_id():
+    """The ID value from /etc/os-release, or None if unavailable."""
+    try:
+        with open("/etc/os-release", encoding="utf-8") as f:
+            text = f.read()
+    except OSError:
+        return None
+
+    for line in text.splitlines():
+        key, _, value = line.partition("=")
+        if key == "ID":
+            return value.strip().strip("\"'").lower()
+    return None
+
+def _compute_system():
     system = platform.system().lower()
 
     if system == "linux":
+        distro = _os_release_id()
+        if distro in _KNOWN_DISTROS:
+            return "linux", distro
+        # Nothing known in os-release, fall back to the release marker files
         if os.path.exists("/etc/debian_version"):
             return "linux", "debian"
         if os.path.exists("/etc/arch-release"):
@@ -85,10 +201,34 @@ def detect_system():
 
     return system, "unknown"
 
+# The host doesn't change under a running process, so detect once at import
+_SYSTEM, _DISTRO = _compute_system()
+
+def detect_system():
+    return _SYSTEM, _DISTRO
+
 # ============================
 # Dependencies
 # ============================
 
+# Markers of the last apt update, most reliable first. pkgcache.bin is
+# also rebuilt on every dpkg change, so it's only a last resort.
+APT_UPDATE_STAMPS = (
+    "/var/lib/apt/periodic/update-success-stamp",
+    "/var/lib/apt/lists",
+    "/var/cache/apt/pkgcache.bin",
+)
+APT_MAX_AGE = 24 * 60 * 60
+
+def _apt_index_fresh():
+    """True if apt's package lists were updated within APT_MAX_AGE."""
+    for stamp in APT_UPDATE_STAMPS:
+        try:
+            return time.time() - os.path.getmtime(stamp) < APT_MAX_AGE
+        except OSError:
+            continue
+    return False
+
 def install_dependencies(deps, distro):
     if distro not in deps:
         print("No dependencies for this distro.")
@@ -102,24 +242,90 @@ def install_dependencies(deps, distro):
     print("Installing dependencies:", " ".join(need))
 
     if distro == "debian":
-        subprocess.run(["sudo", "apt", "update"])
-        subprocess.run(["sudo", "apt", "install", "-y"] + need)
+        install = ["apt-get", "install", "-y", "--no-install-recommends"] + need
+        if _apt_index_fresh():
+            subprocess.run(["sudo"] + install)
+        else:
+            # Refresh and install under a single sudo/child process. Like the
+            # separate apt update did, a failed refresh (e.g. one broken
+            # third-party repo) doesn't stop the install.
+            script = ("apt-get update -qq || echo 'apt-get update failed, installing anyway' >&2; "
+                      + shlex.join(install))
+            subprocess.run(["sudo", "sh", "-c", script])
 
     elif distro == "arch":
-        subprocess.run(["sudo", "pacman", "-Sy", "--needed"] + need)
+        subprocess.run(["sudo", "pacman", "-S", "--needed"] + need)
 
     elif distro == "fedora":
-        subprocess.run(["sudo", "dnf", "install", "-y"] + need)
+        subprocess.run(["sudo", "dnf", "install", "-y", "--setopt=install_weak_deps=False"] + need)
 
 # ============================
 # Release Download w/ Cache
 # ============================
 
+# Signature/checksum files published next to the real assets
+_SIDECAR_EXTS = (".sig", ".asc", ".sha256")
+
+def _pick_asset(assets, match):
+    """Pick the first asset whose name contains match, skipping sidecar files."""
+    # Unless the entry asks for one, ".deb" shouldn't pick foo.deb.sig
+    skip_sidecars = not match.endswith(_SIDECAR_EXTS)
+
+    for asset in assets:
+        name = asset["name"]
+        if skip_sidecars and name.endswith(_SIDECAR_EXTS):
+            continue
+        if match in name:
+            return asset
+    return None
+
+# Release-wide checksum files, compared case-insensitively
+_SUMS_NAMES = ("sha256sums", "sha256sums.txt", "checksums.txt", "checksums.sha256")
+
+# sha256sum style "<hex>  <name>", "<hex> *<name>" or a bare "<hex>"
+_GNU_SUM_LINE = re.compile(r"\s*([0-9a-fA-F]{64})(?:\s+\*?(.+?))?\s*$")
+# BSD/openssl style "SHA256 (<name>) = <hex>" or "SHA2-256(<name>)= <hex>"
+_BSD_SUM_LINE = re.compile(r"\s*SHA2?-?256\s*\((.+)\)\s*=\s*([0-9a-fA-F]{64})\s*$", re.IGNORECASE)
+
+def _expected_sha256(assets, filename):
+    """SHA-256 published for filename in the release, or None if there isn't one."""
+    sums = next((a for a in assets if a["name"] == filename + ".sha256"), None)
+    per_file = sums is not None
+    if sums is None:
+        sums = next((a for a in assets if a["name"].lower() in _SUMS_NAMES), None)
+    if sums is None:
+        return None
+
+    try:
+        r = SESSION.get(sums["browser_download_url"], timeout=10)
+    except requests.RequestException:
+        return None
+    if r.status_code != 200:
+        return None
+
+    for line in r.text.splitlines():
+        m = _GNU_SUM_LINE.match(line)
+        if m:
+            digest, name = m.groups()
+        else:
+            m = _BSD_SUM_LINE.match(line)
+            if not m:
+                continue
+            name, digest = m.groups()
+
+        # A bare digest is only meaningful in a per-file .sha256
+        if name is None:
+            if per_file:
+                return digest.lower()
+        elif posixpath.basename(name) == filename:
+            return digest.lower()
+    return None
+
 def download_latest(repo, match, force=False):
     """Download only the asset matching the user’s distro."""
     api = f"https://api.github.com/repos/{repo}/releases/latest"
 
-    r = requests.get(api)
+    r = SESSION.get(api)
     if r.status_code != 200:
         print("Failed to fetch release.")
         return None
@@ -127,60 +333,248 @@ def download_latest(repo, match, force=False):
     assets = r.json().get("assets", [])
 
     # Pick asset that matches substring (e.g., ".deb")
-    for asset in assets:
-        if match in asset["name"]:
-            url = asset["browser_download_url"]
-            filename = asset["name"]
-            local_path = CACHE_DIR / filename
-
-            # Cached?
-            if local_path.exists() and not force:
-                print(f"Using cached file: {local_path}")
-                return local_path
-
-            print(f"Downloading {filename}...")
-            with requests.get(url, stream=True) as f:
-                f.raise_for_status()
-                with open(local_path, "wb") as out:
-                    for chunk in f.iter_content(8192):
-                        out.write(chunk)
+    asset = _pick_asset(assets, match)
+    if asset is None:
+        print("No matching asset found.")
+        return None
 
-            print(f"Saved to cache: {local_path}")
-            return local_path
+    url = asset["browser_download_url"]
+    filename = asset["name"]
+    local_path = CACHE_DIR / filename
 
-    print("No matching asset found.")
-    return None
+    # Cached?
+    if local_path.exists() and not force:
+        print(f"Using cached file: {local_path}")
+        return local_path
+
+    expected = _expected_sha256(assets, filename)
+
+    print(f"Downloading {filename}...")
+    h = hashlib.sha256()
+    # Download beside the cache entry and only move it into place once it
+    # is complete and verified, so an interrupted run can't leave a
+    # truncated file that the next run would install from cache
+    fd, tmp = tempfile.mkstemp(dir=CACHE_DIR, prefix=".download-")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            # Assets are usually compressed already, so ask for the bytes as-is
+            # rather than paying to gunzip a transfer encoding on every chunk
+            with SESSION.get(url, stream=True, headers={"Accept-Encoding": "identity"}) as f:
+                f.raise_for_status()
+                # Only matters if a server ignores the header above
+                f.raw.decode_content = True
+                # Hash while writing so verifying costs no second read
+                for chunk in iter(lambda: f.raw.read(1024 * 1024), b""):
+                    h.update(chunk)
+                    out.write(chunk)
+
+        if expected:
+            if h.hexdigest() != expected:
+                print(f"Checksum mismatch for {filename}, download discarded.")
+                return None
+            print("Checksum verified.")
+
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, local_path)
+    finally:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+
+    print(f"Saved to cache: {local_path}")
+    return local_path
 
 # ============================
-# Install extracted data
+# Archive extraction
 # ============================
 
-def install_file(path, system, distro):
-    path = str(path)
-    print(f"Installing {path} ...")
+_TAR_BUFSIZE = 1024 * 1024
+
+def _patched_copyfileobj(src, dst, length=None, exception=OSError, bufsize=None):
+    """tarfile.copyfileobj with an in-kernel fast path and a 1 MiB buffer."""
+    if (length and hasattr(os, "copy_file_range")
+            and isinstance(src, io.BufferedReader)
+            and isinstance(dst, io.BufferedWriter)):
+        try:
+            dst.flush()
+            src_pos, dst_pos = src.tell(), dst.tell()
+            copied = 0
+            while copied < length:
+                n = os.copy_file_range(src.fileno(), dst.fileno(), length - copied,
+                                       src_pos + copied, dst_pos + copied)
+                if n == 0:
+                    if copied == 0:
+                        # Some filesystems report 0 instead of failing
+                        break
+                    raise exception("unexpected end of data")
+                copied += n
+            else:
+                src.seek(src_pos + length)
+                dst.seek(dst_pos + length)
+                return
+        except OSError:
+            # Cross-device, unsupported fs, etc: redo it in userspace
+            pass
+
+    # Stdlib copy loop, but defaulting to 1 MiB instead of 16 KiB
+    bufsize = bufsize or _TAR_BUFSIZE
+    if length == 0:
+        return
+    if length is None:
+        shutil.copyfileobj(src, dst, bufsize)
+        return
+
+    blocks, remainder = divmod(length, bufsize)
+    for _ in range(blocks):
+        buf = src.read(bufsize)
+        if len(buf) < bufsize:
+            raise exception("unexpected end of data")
+        dst.write(buf)
+
+    if remainder != 0:
+        buf = src.read(remainder)
+        if len(buf) < remainder:
+            raise exception("unexpected end of data")
+        dst.write(buf)
 
-    if path.endswith(".deb"):
-        subprocess.run(["sudo", "apt", "install", "-y", path])
+tarfile.copyfileobj = _patched_copyfileobj
 
-    elif path.endswith(".rpm"):
-        subprocess.run(["sudo", "rpm", "-i", path])
+_TAR_EXTS = (".tar.gz", ".tgz", ".tar.xz", ".tar.bz2", ".tar")
 
-    elif path.endswith(".zip"):
-        dest = path + "_extracted"
-        with zipfile.ZipFile(path) as z:
-            z.extractall(dest)
-        print("Extracted to", dest)
+# Native decompressors, used in place of Python's gzip/lzma/bz2 when present
+_TAR_DECOMPRESSORS = {
+    ".tar.gz": ["gzip", "-dc"],
+    ".tgz": ["gzip", "-dc"],
+    ".tar.xz": ["xz", "-dc"],
+    ".tar.bz2": ["bzip2", "-dc"],
+}
 
-    elif any(path.endswith(x) for x in [".tar.gz", ".tgz", ".tar.xz"]):
-        dest = path + "_extracted"
+def _extract_tar(path, dest):
+    """Extract a tarball, decompressing it in a separate process if possible."""
+    cmd = next((c for ext, c in _TAR_DECOMPRESSORS.items() if path.endswith(ext)), None)
+
+    if cmd is None or shutil.which(cmd[0]) is None:
         with tarfile.open(path, "r:*") as t:
             t.extractall(dest)
-        print("Extracted to", dest)
+        return
+
+    proc = subprocess.Popen(cmd + [path], stdout=subprocess.PIPE)
+    finished = False
+    try:
+        with tarfile.open(fileobj=proc.stdout, mode="r|") as t:
+            t.extractall(dest)
+        finished = True
+    finally:
+        proc.stdout.close()
+        proc.wait()
+
+    ok = {0}
+    if cmd[0] == "gzip":
+        # gzip's "decompression OK, trailing garbage ignored" warning
+        ok.add(2)
+    if finished:
+        # Closing the pipe after end-of-archive may kill it with SIGPIPE
+        ok.add(-signal.SIGPIPE)
+
+    if proc.returncode not in ok:
+        raise tarfile.ReadError(f"{cmd[0]} exited with status {proc.returncode}")
+
+def _extract_zip(path, dest):
+    """Extract a zip archive, spreading members over a thread pool."""
+    local = threading.local()
+    handles = []
+
+    def extract(member):
+        # ZipFile handles aren't safe to share, so each worker opens its own
+        z = getattr(local, "zip", None)
+        if z is None:
+            z = local.zip = zipfile.ZipFile(path)
+            handles.append(z)
+        z.extract(member, dest)
+
+    with zipfile.ZipFile(path) as z:
+        members = z.infolist()
+        files = [m for m in members if not m.is_dir()]
+
+        # Create every directory serially first so workers never race on mkdir;
+        # extracting them as ZipInfo entries reuses zipfile's path sanitizing
+        dirs = {m.filename for m in members if m.is_dir()}
+        dirs.update(posixpath.dirname(m.filename) + "/" for m in files)
+        for d in sorted(dirs):
+            z.extract(zipfile.ZipInfo(d), dest)
+
+    try:
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as ex:
+            list(ex.map(extract, files))
+    finally:
+        for z in handles:
+            z.close()
+
+# ============================
+# Install extracted data
+# ============================
+
+def _install_deb(path):
+    subprocess.run(["sudo", "apt", "install", "-y", path])
+
+def _install_rpm(path):
+    subprocess.run(["sudo", "rpm", "-i", path])
+
+def _install_zip(path):
+    dest = path + "_extracted"
+    _extract_zip(path, dest)
+    print("Extracted to", dest)
+
+def _install_tar(path):
+    dest = path + "_extracted"
+    _extract_tar(path, dest)
+    print("Extracted to", dest)
+
+# Asset suffix -> installer, checked on the last two suffixes then the last one
+_DISPATCH = {
+    ".deb": _install_deb,
+    ".rpm": _install_rpm,
+    ".zip": _install_zip,
+    **dict.fromkeys(_TAR_EXTS, _install_tar),
+}
+
+def install_file(path, system, distro):
+    path = str(path)
+    print(f"Installing {path} ...")
+
+    suffixes = Path(path).suffixes
+    handler = _DISPATCH.get("".join(suffixes[-2:])) or _DISPATCH.get("".join(suffixes[-1:]))
+    if handler:
+        handler(path)
 
 # ============================
 # Main CLI
 # ============================
 
+def _start_background(fn, *args):
+    """Run fn(*args) on a daemon thread; call the returned function to join it.
+
+    A daemon thread (unlike an executor worker) doesn't hold up Ctrl-C or
+    interpreter exit while it is still downloading.
+    """
+    outcome = {}
+
+    def run():
+        try:
+            outcome["result"] = fn(*args)
+        except BaseException as e:
+            outcome["error"] = e
+
+    t = threading.Thread(target=run, daemon=True)
+    t.start()
+
+    def result():
+        t.join()
+        if "error" in outcome:
+            raise outcome["error"]
+        return outcome["result"]
+
+    return result
+
 def main():
     if len(sys.argv) < 2:
         print("Usage: shipm <install|deps|update> <package>")
@@ -220,11 +614,18 @@ def main():
 
     # install
     if command == "install":
-        install_dependencies(pkg_info["deps"], distro)
-
         # match correct file type
         match = pkg_info["assets"].get(distro, "")
-        f = download_latest(pkg_info["repo"], match)
+
+        # Get any sudo password prompt done before background output starts
+        if pkg_info["deps"].get(distro):
+            subprocess.run(["sudo", "-v"])
+
+        # Fetch the release in the background while deps install
+        download = _start_background(download_latest, pkg_info["repo"], match)
+        install_dependencies(pkg_info["deps"], distro)
+        f = download()
+
         if f:
             install_file(f, system, distro)
         return